@@ -0,0 +1,58 @@
+"""
+run_batch() (MachineState + run_steps, compiled when numba is installed)
+against the same actions called one by one on USPVirel.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from usp_virel import OP_CAST_VOTE, OP_HALT_PRECEDENCE, OP_STEP, State, USPVirel, USPVirelConfig
+
+
+def direct(m, op, i, j):
+    """
+    The run_steps() outcome of one script row, via the Python actions.
+    """
+    if op == OP_CAST_VOTE:
+        return int(m.cast_vote(m.cfg.domains[i], m.cfg.tokens[j]))
+    if op == OP_HALT_PRECEDENCE:
+        return int(m.halt_precedence())
+    return {"idle": 0, "halt_precedence": 1, "safe_on": 2}[m.auto_step()]
+
+
+@pytest.mark.parametrize("n_domains", [3, 200])
+def test_run_batch_matches_direct_calls(n_domains):
+    cfg = USPVirelConfig([f"D{i}" for i in range(n_domains)], ["RES", "HALT"], 3, 5, 0)
+    rng = random.Random(n_domains)
+    for _ in range(200):
+        a, b = USPVirel(cfg), USPVirel(cfg)
+        rows = [
+            (rng.choice([OP_CAST_VOTE] * 3 + [OP_HALT_PRECEDENCE, OP_STEP]),
+             rng.randrange(n_domains), rng.randrange(2))
+            for _ in range(12)
+        ]
+        expected = [direct(a, *row) for row in rows]
+        assert b.run_batch(np.array(rows)).tolist() == expected
+        assert b.fingerprint() == a.fingerprint()
+        assert b.votes == a.votes
+
+
+def test_run_batch_keeps_actions_before_an_error():
+    cfg = USPVirelConfig(["A", "B"], ["HALT", "RES"], 1, 0, 0)
+    m = USPVirel(cfg)
+    script = [(OP_CAST_VOTE, 0, 0), (OP_CAST_VOTE, 0, 1), (OP_STEP, 0, 0)]
+    with pytest.raises(AssertionError, match="LamportMax"):
+        m.run_batch(script)
+    assert m.state == State.OPERATIONAL
+    assert m.votes == (("HALT", "RES"), ())
+
+
+@pytest.mark.parametrize("row", [
+    (OP_CAST_VOTE, 2, 0), (OP_CAST_VOTE, 256, 0), (OP_CAST_VOTE, 0, 2), (7, 0, 0), (-1, 0, 0),
+])
+def test_run_batch_rejects_unknown_indices(row):
+    m = USPVirel(USPVirelConfig(["A", "B"], ["HALT", "RES"], 1, 1, 0))
+    with pytest.raises(ValueError):
+        m.run_batch([row])
+    assert m.votes == ((), ())
@@ -0,0 +1,110 @@
+"""
+USPVirel construction and views.
+"""
+import random
+
+import pytest
+
+from usp_virel import State, USPVirel, USPVirelConfig
+
+CFG = USPVirelConfig(["A", "B"], ["HALT", "RES"], 5, 5, 0)
+
+
+@pytest.mark.parametrize("state", [State.SAFE_ON, "SAFE_ON", 1])
+def test_state_coercion(state):
+    m = USPVirel(CFG, state=state, quorum_votes={"A": ["HALT"], "B": []})
+    assert m.state is State.SAFE_ON
+
+
+@pytest.mark.parametrize("state", ["BOGUS", 7, None, 1.5])
+def test_invalid_state(state):
+    with pytest.raises(AssertionError, match="Invalid state"):
+        USPVirel(CFG, state=state)
+
+
+def test_fingerprint_tracks_votes():
+    cfg = USPVirelConfig(["A", "B", "C", "D"], ["HALT", "RES", "X"], 5, 5, 0, step_cache_size=8)
+    rng = random.Random(3)
+    for _ in range(500):
+        m = USPVirel(cfg)
+        for _ in range(12):
+            r = rng.random()
+            if r < 0.7:
+                m.cast_vote(rng.choice(cfg.domains), rng.choice(cfg.tokens))
+            elif r < 0.8:
+                m = m.clone()
+            else:
+                m.auto_step()
+            rebuilt = USPVirel(cfg, state=m.state, lamport=m.lamport,
+                               quorum_votes=dict(m.quorum_votes))
+            assert m.fingerprint() == rebuilt.fingerprint()
+    assert len(cfg._step_cache) <= 8
+
+
+def test_auto_step_goes_through_halt_precedence():
+    class NoHalt(USPVirel):
+        __slots__ = ()
+
+        def halt_precedence(self):
+            return False
+
+    m = NoHalt(CFG, quorum_votes={"A": ["HALT", "RES"], "B": []})
+    assert m.auto_step() == "idle"
+    assert m.state is State.OPERATIONAL
+    assert USPVirel(CFG, quorum_votes={"A": ["HALT", "RES"], "B": []}).auto_step() == "halt_precedence"
+
+
+def test_vote_views_are_read_only():
+    m = USPVirel(CFG)
+    m.cast_vote("A", "HALT")
+    assert m.votes == (("HALT",), ())
+    assert dict(m.quorum_votes) == {"A": ("HALT",), "B": ()}
+    with pytest.raises(TypeError):
+        m.quorum_votes["A"] = ()
+    with pytest.raises(AttributeError):
+        m.quorum_votes["A"].append("RES")
+    assert repr(m) == "USP_VIREL(state=OPERATIONAL, epoch=0, lamport=0, votes={'A': ['HALT'], 'B': []}, timer=0)"
+
+
+def test_value_equality():
+    a, b = USPVirel(CFG), USPVirel(CFG)
+    assert a == b and a == a.clone()
+    a.cast_vote("A", "HALT")
+    a.cast_vote("A", "RES")
+    b.cast_vote("A", "RES")
+    b.cast_vote("A", "HALT")
+    assert a != b                           # vote order matters
+    assert a.fingerprint() == b.fingerprint()
+    c = a.clone()
+    c.provisional_timer = 1
+    assert a != c
+    assert USPVirel(CFG) != USPVirel(USPVirelConfig(["A", "B"], ["HALT", "RES"], 5, 5, 0))
+    with pytest.raises(TypeError):
+        hash(a)
+
+
+def test_clone_starts_with_an_empty_log():
+    m = USPVirel(CFG)
+    m.cast_vote("A", "HALT")
+    c = m.clone()
+    assert c.drain_events() == []
+    assert m.drain_events() == ["CAST HALT IN A"]
+
+
+def test_seeded_votes():
+    m = USPVirel(CFG, quorum_votes={"A": ["RES", "HALT"], "B": ["RES"]})
+    n = USPVirel(CFG)
+    for d, t in (("A", "RES"), ("A", "HALT"), ("B", "RES")):
+        n.cast_vote(d, t)
+    assert m == n and m.fingerprint() == n.fingerprint()
+
+
+@pytest.mark.parametrize("seed, error", [
+    ({"A": []}, AssertionError),
+    ({"A": ["X"], "B": []}, AssertionError),
+    ({"A": "HALT", "B": []}, AssertionError),
+    ({"A": ["RES"] * 3, "B": []}, ValueError),
+])
+def test_invalid_seed(seed, error):
+    with pytest.raises(error):
+        USPVirel(CFG, quorum_votes=seed)
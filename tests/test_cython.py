@@ -0,0 +1,82 @@
+"""
+The Cython port (usp_virel/usp_virel_c.pyx, once built in place with
+cythonize -i) against usp_virel.core.USPVirel.
+"""
+import random
+
+import pytest
+
+from usp_virel import STEP_HALT_PRECEDENCE, STEP_IDLE, STEP_SAFE_ON, USPVirel, USPVirelConfig
+
+usp_virel_c = pytest.importorskip("usp_virel.usp_virel_c")
+
+STEP_CODES = {"idle": STEP_IDLE, "halt_precedence": STEP_HALT_PRECEDENCE, "safe_on": STEP_SAFE_ON}
+
+
+def build(cfg):
+    return usp_virel_c.USPVirel(
+        len(cfg.domains), len(cfg.tokens), cfg.token_index.get("HALT", -1),
+        cfg.epoch_max, cfg.lamport_max,
+    )
+
+
+def outcome(action):
+    """
+    (result, AssertionError text or None) of calling action().
+    """
+    try:
+        return action(), None
+    except AssertionError as e:
+        return None, str(e)
+
+
+def test_matches_python_machine():
+    cfg = USPVirelConfig(["A", "B", "C"], ["RES", "HALT"], 3, 2, 0)
+    rng = random.Random(5)
+    for _ in range(300):
+        a, c = USPVirel(cfg), build(cfg)
+        for _ in range(10):
+            op = rng.randrange(3)
+            if op == 0:
+                i, j = rng.randrange(3), rng.randrange(2)
+                assert c.cast_vote(i, j) == a.cast_vote(cfg.domains[i], cfg.tokens[j])
+            elif op == 1:
+                assert outcome(c.halt_precedence) == outcome(a.halt_precedence)
+            else:
+                got, err = outcome(c.step)
+                expected, expected_err = outcome(a.auto_step)
+                assert err == expected_err
+                if err is None:
+                    assert got == STEP_CODES[expected]
+            assert (c.state, c.epoch, c.lamport) == (int(a.state), a.epoch, a.lamport)
+            assert [c.votes_of(i) for i in range(3)] == [
+                [cfg.token_index[t] for t in v] for v in a.votes
+            ]
+
+
+def test_step_many():
+    c = usp_virel_c.USPVirel(2, 2, 0, 1, 1)
+    c.cast_vote(0, 0)
+    c.cast_vote(0, 1)
+    assert c.step_many(1000) == STEP_SAFE_ON
+    assert (c.state, c.lamport) == (1, 1)
+
+    c = usp_virel_c.USPVirel(2, 2, 0, 1, 0)
+    c.cast_vote(0, 0)
+    c.cast_vote(0, 1)
+    with pytest.raises(AssertionError, match="LamportMax"):
+        c.step_many(3)
+
+
+def test_rejects_unknown_indices():
+    c = usp_virel_c.USPVirel(2, 2, 0, 1, 1)
+    with pytest.raises(ValueError):
+        c.cast_vote(5, 0)
+    with pytest.raises(ValueError):
+        c.cast_vote(0, 2)
+    with pytest.raises(ValueError):
+        usp_virel_c.USPVirel(65, 2, 0, 1, 1)
+    for halt_token in (-2, 2, 9, 32):
+        with pytest.raises(ValueError):
+            usp_virel_c.USPVirel(2, 2, halt_token, 1, 1)
+    usp_virel_c.USPVirel(2, 2, -1, 1, 1)
@@ -0,0 +1,71 @@
+"""
+generate_reachable() against a plain depth-first search over USPVirel
+actions.
+"""
+import pytest
+
+from usp_virel import USPVirel, USPVirelConfig, generate_reachable
+
+
+def brute_force(start):
+    """
+    Fingerprints of every state reachable from start by CastVote and
+    HaltPrecedence (disabled at LamportMax), via clone() and the actions.
+    """
+    cfg = start.cfg
+    seen = {start.fingerprint()}
+    todo = [start]
+    while todo:
+        m = todo.pop()
+        successors = []
+        for d in cfg.domains:
+            for t in cfg.tokens:
+                c = m.clone()
+                if c.cast_vote(d, t):
+                    successors.append(c)
+        c = m.clone()
+        try:
+            if c.halt_precedence():
+                successors.append(c)
+        except AssertionError:
+            pass
+        for c in successors:
+            if c.fingerprint() not in seen:
+                seen.add(c.fingerprint())
+                todo.append(c)
+    return sorted(seen)
+
+
+CONFIGS = [
+    USPVirelConfig(["A", "B"], ["HALT", "RES"], 3, 3, 0),
+    USPVirelConfig(["A", "B", "C"], ["RES", "X", "HALT"], 2, 1, 0),
+    USPVirelConfig(["A"], ["HALT"], 0, 0, 0),
+    USPVirelConfig(["A", "B"], ["RES"], 1, 1, 0),
+]
+
+
+@pytest.mark.parametrize("cfg", CONFIGS)
+def test_matches_brute_force(cfg):
+    reachable = generate_reachable(cfg)
+    assert reachable.dtype == "uint64"
+    assert reachable.tolist() == brute_force(USPVirel(cfg))
+    for fp in reachable.tolist():
+        assert USPVirel.from_fingerprint(cfg, fp).fingerprint() == fp
+
+
+def test_from_start_state():
+    cfg = CONFIGS[0]
+    start = USPVirel(cfg, epoch=2, lamport=1, quorum_votes={"A": ["RES"], "B": []})
+    assert generate_reachable(cfg, start).tolist() == brute_force(start)
+
+
+def test_rejects_start_on_another_config():
+    other = USPVirelConfig(["A", "B"], ["HALT", "RES"], 3, 3, 0)
+    with pytest.raises(ValueError, match="start"):
+        generate_reachable(CONFIGS[0], USPVirel(other))
+
+
+def test_rejects_configs_too_wide_to_pack():
+    cfg = USPVirelConfig([f"D{i}" for i in range(20)], ["HALT", "RES"], 3, 3, 0)
+    with pytest.raises(ValueError, match="63 bits"):
+        generate_reachable(cfg)
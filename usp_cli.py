@@ -1,118 +1,66 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List, Dict, Literal
 import sys
 
-State = Literal["OPERATIONAL", "SAFE_ON"]
+from usp_virel.core import State, USPVirel, USPVirelConfig
 
 
 # ============================================================
 #  CONFIG (corresponding to CONSTANTS in TLA)
 # ============================================================
 
-@dataclass(frozen=True)
-class USPVirelConfig:
-    domains: List[str]
-    tokens: List[str]
-    epoch_max: int
-    lamport_max: int
-    hold_ms: int
+CONFIG = USPVirelConfig(
+    domains=("A", "B"),
+    tokens=("HALT", "RES"),
+    epoch_max=5,
+    lamport_max=5,
+    hold_ms=1000,
+)
 
 
 # ============================================================
-#  STATE MACHINE IMPLEMENTATION
+#  INTERACTIVE STATE MACHINE
 # ============================================================
 
-@dataclass
-class USPVirel:
-    cfg: USPVirelConfig
-    state: State = "OPERATIONAL"
-    epoch: int = 0
-    lamport: int = 0
-    quorum_votes: Dict[str, List[str]] = field(default_factory=dict)
-    provisional_timer: int = 0
-
-    def __post_init__(self):
-        if not self.quorum_votes:
-            self.quorum_votes = {d: [] for d in self.cfg.domains}
-        self._check_type_ok()
-
-    # ---------------------- helpers ------------------------------------
-
-    def _has_halt(self, d: str) -> bool:
-        return "HALT" in self.quorum_votes[d]
-
-    def _check_type_ok(self):
-        assert self.state in {"OPERATIONAL", "SAFE_ON"}
-        assert 0 <= self.epoch <= self.cfg.epoch_max
-        assert 0 <= self.lamport <= self.cfg.lamport_max
-        assert isinstance(self.provisional_timer, int)
-
-        for d, seq in self.quorum_votes.items():
-            for t in seq:
-                assert t in self.cfg.tokens
-
-    def _check_safe_state(self):
-        if self.state == "SAFE_ON":
-            if not any(self._has_halt(d) for d in self.cfg.domains):
-                raise AssertionError(
-                    "Invariant violation: SAFE_ON without HALT quorum."
-                )
-
-    def assert_invariants(self):
-        self._check_type_ok()
-        self._check_safe_state()
+class CliUSPVirel(USPVirel):
+    """
+    USPVirel that reports every action on stdout, for interactive use.
+    """
+    __slots__ = ()
+
+    def _print_events(self):
+        for line in self.drain_events():
+            print(line)
+
+    def format_event(self, event: tuple) -> str:
+        if event[0] == "CAST":
+            return f"📥 CAST {event[2]} IN {event[1]}"
+        return f"⚠️  HALT QUORUM FOR {event[1]} → SAFE_ON"
 
     # ---------------------- actions ------------------------------------
 
     def cast_vote(self, d: str, token: str) -> bool:
-        if self.state != "OPERATIONAL":
+        if self.state != State.OPERATIONAL:
             print("❌ Cannot cast vote: state is SAFE_ON.")
             return False
 
-        if d not in self.cfg.domains:
-            print(f"❌ Unknown domain: {d}")
+        try:
+            ok = super().cast_vote(d, token)
+        except ValueError as e:
+            print(f"❌ {e}")
             return False
 
-        if token not in self.cfg.tokens:
-            print(f"❌ Unknown token: {token}")
-            return False
-
-        if len(self.quorum_votes[d]) >= 2:
+        if not ok:
             print(f"❌ Domain {d} already has 2 votes.")
-            return False
-
-        self.quorum_votes[d].append(token)
-        print(f"📥 CAST {token} IN {d}")
-        self.assert_invariants()
-        return True
+        self._print_events()
+        return ok
 
     def halt_precedence(self) -> bool:
-        if self.state != "OPERATIONAL":
-            return False
-
-        for d in self.cfg.domains:
-            if len(self.quorum_votes[d]) >= 2 and self._has_halt(d):
-                self.state = "SAFE_ON"
-                self.lamport += 1
-                print(f"⚠️  HALT QUORUM FOR {d} → SAFE_ON")
-                self.assert_invariants()
-                return True
-
-        return False
+        ok = super().halt_precedence()
+        self._print_events()
+        return ok
 
-    def safe_on_stays_safe(self):
-        if self.state == "SAFE_ON":
-            self.assert_invariants()
-            return True
-        return False
-
-    def idle(self):
-        self.assert_invariants()
-        return True
-
-    def step(self):
+    def step(self) -> str:
         """
         Next =
             CastVote  (not auto here)
@@ -120,26 +68,49 @@ class USPVirel:
             OR SafeOnStaysSafe
             OR Idle
         """
-        if self.halt_precedence():
-            return "halt_precedence"
-
-        if self.state == "SAFE_ON":
-            self.safe_on_stays_safe()
-            return "safe_on"
-
-        self.idle()
-        return "idle"
+        action = self.auto_step()
+        self._print_events()
+        return action
 
     # ---------------------- display ------------------------------------
 
     def show(self):
         print("\n🔎 CURRENT STATE")
         print("------------------------")
-        print(f" state          = {self.state}")
+        print(f" state          = {self.state.name}")
         print(f" epoch          = {self.epoch}")
         print(f" lamport        = {self.lamport}")
         print(f" provisional_ms = {self.provisional_timer}")
         print(f" votes:")
-        for d,v in self.quorum_votes.items():
-            print(f"   {d}: {v}")
-        print("------------------------\n")
\ No newline at end of file
+        for d,v in zip(self.cfg.domains, self.votes):
+            print(f"   {d}: {list(v)}")
+        print("------------------------\n")
+
+
+# ============================================================
+#  ENTRYPOINT
+# ============================================================
+
+def main() -> None:
+    m = CliUSPVirel(CONFIG)
+    print("USP_VIREL CLI — commands: show | cast <domain> <token> | step | exit")
+
+    for line in sys.stdin:
+        cmd = line.split()
+        if not cmd:
+            continue
+
+        if cmd[0] in ("exit", "quit"):
+            break
+        elif cmd[0] == "show":
+            m.show()
+        elif cmd[0] == "cast" and len(cmd) == 3:
+            m.cast_vote(cmd[1], cmd[2])
+        elif cmd[0] == "step":
+            print(f"➡️  {m.step()}")
+        else:
+            print(f"❌ Unknown command: {line.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Python implementation of the USP_VIREL TLA+ spec (see "module 1").
+"""
+from .core import (
+    OP_CAST_VOTE,
+    OP_HALT_PRECEDENCE,
+    OP_STEP,
+    STEP_HALT_PRECEDENCE,
+    STEP_IDLE,
+    STEP_SAFE_ON,
+    MachineState,
+    State,
+    USPVirel,
+    USPVirelConfig,
+    find_halt_domain,
+    run_steps,
+)
+from .explore import generate_reachable
+
+__all__ = [
+    "OP_CAST_VOTE",
+    "OP_HALT_PRECEDENCE",
+    "OP_STEP",
+    "STEP_HALT_PRECEDENCE",
+    "STEP_IDLE",
+    "STEP_SAFE_ON",
+    "MachineState",
+    "State",
+    "USPVirel",
+    "USPVirelConfig",
+    "find_halt_domain",
+    "generate_reachable",
+    "run_steps",
+]
@@ -0,0 +1,751 @@
+from __future__ import annotations
+from collections import OrderedDict, deque
+from dataclasses import InitVar, dataclass, field
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit
+    from numba.experimental import jitclass
+except ImportError:  # numba is optional; the kernels then run as plain Python
+    numba = None
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorate(fn):
+            return fn
+        return decorate
+
+    def jitclass(spec):
+        def decorate(cls):
+            return cls
+        return decorate
+
+
+class State(IntEnum):
+    OPERATIONAL = 0
+    SAFE_ON = 1
+
+
+EMPTY_VOTE = 255    # token id stored in an unused vote slot
+
+VECTORIZE_MIN_DOMAINS = 32  # see the numba-less find_halt_domain()
+# see specialize_halt_scan(): unrolled Python only beats the jitted loop for
+# one or two domains, but beats the Python loop up to about eight
+SPECIALIZE_MAX_DOMAINS = 2 if numba is not None else 8
+
+# run_steps() script opcodes: each script row is (op, domain index, token index)
+OP_CAST_VOTE = 0
+OP_HALT_PRECEDENCE = 1
+OP_STEP = 2
+
+# run_steps() outcomes for OP_STEP rows (other rows report 1 = fired, 0 = not)
+STEP_IDLE = 0
+STEP_HALT_PRECEDENCE = 1
+STEP_SAFE_ON = 2
+
+
+# ----------------------------------------------------------------------
+# Kernels over the per-domain vote arrays (see USPVirel._counts/_masks)
+# ----------------------------------------------------------------------
+
+@njit(cache=True, boundscheck=False)
+def find_halt_domain(counts, masks, halt_mask):
+    """
+    Index of the first domain d with Len(quorum_votes[d]) ≥ 2 ∧ HasHALT(d),
+    or -1 if there is none.
+    """
+    for i in range(counts.shape[0]):
+        if counts[i] >= 2 and (masks[i] & halt_mask):
+            return i
+    return -1
+
+
+if numba is None:
+    _find_halt_domain_loop = find_halt_domain
+
+    def find_halt_domain(counts, masks, halt_mask):
+        """
+        Without numba, scan large domain arrays in one branchless NumPy pass
+        instead of per element in the interpreter. Below
+        VECTORIZE_MIN_DOMAINS the ufunc call overhead outweighs the loop.
+        """
+        if counts.shape[0] < VECTORIZE_MIN_DOMAINS:
+            return _find_halt_domain_loop(counts, masks, halt_mask)
+        hit = (counts >= 2) & ((masks & halt_mask) != 0)
+        return int(hit.argmax()) if hit.any() else -1
+
+
+def specialize_halt_scan(n_domains: int, halt_mask: int) -> Callable:
+    """
+    find_halt_domain() partially evaluated for one config: for up to
+    SPECIALIZE_MAX_DOMAINS domains, generate halt_scan(counts, masks) with
+    the loop unrolled and the domain indices and halt_mask baked in as
+    constants. Larger configs get the generic kernel.
+    """
+    if n_domains > SPECIALIZE_MAX_DOMAINS:
+        return lambda counts, masks: find_halt_domain(counts, masks, halt_mask)
+
+    src = ["def halt_scan(counts, masks):"]
+    if halt_mask:
+        for i in range(n_domains):
+            src.append(f"    if counts[{i}] >= 2 and masks[{i}] & {halt_mask}:")
+            src.append(f"        return {i}")
+    src.append("    return -1")
+    ns: Dict[str, Callable] = {}
+    exec(compile("\n".join(src), f"<halt_scan n_domains={n_domains}>", "exec"), ns)
+    return ns["halt_scan"]
+
+
+_MACHINE_SPEC = [] if numba is None else [
+    ("state", numba.int8),          # State value
+    ("epoch", numba.int32),
+    ("lamport", numba.int32),
+    ("timer", numba.int32),
+    ("lamport_max", numba.int32),
+    ("n_tokens", numba.int32),
+    ("halt_mask", numba.int32),
+    ("votes", numba.uint8[:, :]),
+    ("counts", numba.uint8[:]),
+    ("masks", numba.uint8[:]),
+]
+
+
+@jitclass(_MACHINE_SPEC)
+class MachineState:
+    """
+    Compiled mirror of USPVirel used by run_steps(): the same variables and
+    vote arrays, with domains and tokens given by index. It keeps no event
+    log and does not check invariants; USPVirel.run_batch() wraps it.
+    """
+
+    def __init__(self, n_domains, n_tokens, lamport_max, halt_mask):
+        self.state = State.OPERATIONAL
+        self.epoch = 0
+        self.lamport = 0
+        self.timer = 0
+        self.lamport_max = lamport_max
+        self.n_tokens = n_tokens
+        self.halt_mask = halt_mask
+        self.votes = np.full((n_domains, 2), EMPTY_VOTE, dtype=np.uint8)
+        self.counts = np.zeros(n_domains, dtype=np.uint8)
+        self.masks = np.zeros(n_domains, dtype=np.uint8)
+
+    def cast_vote(self, i, j):
+        if i < 0 or i >= self.counts.shape[0]:
+            raise ValueError("Unknown domain")
+        if j < 0 or j >= self.n_tokens:
+            raise ValueError("Unknown token")
+        c = self.counts[i]
+        if self.state != State.OPERATIONAL or c >= 2:
+            return False
+        self.votes[i, c] = j
+        self.counts[i] = c + 1
+        self.masks[i] |= 1 << int(j)
+        return True
+
+    def halt_precedence(self):
+        if self.state != State.OPERATIONAL:
+            return False
+        if find_halt_domain(self.counts, self.masks, self.halt_mask) < 0:
+            return False
+        if self.lamport >= self.lamport_max:
+            raise AssertionError("LamportMax would be exceeded")
+        self.state = State.SAFE_ON
+        self.lamport += 1
+        return True
+
+    def step(self):
+        if self.halt_precedence():
+            return STEP_HALT_PRECEDENCE
+        if self.state == State.SAFE_ON:
+            return STEP_SAFE_ON
+        return STEP_IDLE
+
+
+@njit
+def run_steps(machine, script):
+    """
+    Apply each (op, domain index, token index) row of script to machine and
+    return one int32 outcome per row: 1/0 for OP_CAST_VOTE and
+    OP_HALT_PRECEDENCE (fired or not), a STEP_* code for OP_STEP. Any other
+    op raises ValueError.
+    """
+    out = np.empty(script.shape[0], dtype=np.int32)
+    for n in range(script.shape[0]):
+        op = script[n, 0]
+        if op == OP_CAST_VOTE:
+            out[n] = machine.cast_vote(script[n, 1], script[n, 2])
+        elif op == OP_HALT_PRECEDENCE:
+            out[n] = machine.halt_precedence()
+        elif op == OP_STEP:
+            out[n] = machine.step()
+        else:
+            raise ValueError("Unknown op")
+    return out
+
+
+@dataclass(frozen=True, eq=False)
+class USPVirelConfig:
+    """
+    Configuration corresponding to the CONSTANTS in the TLA+ spec.
+
+    domains and tokens are stored as tuples (lists are accepted). Configs
+    compare and hash by identity, so they are cheap to use as cache keys.
+    """
+    domains: Tuple[str, ...]    # Domains = {"A","B"}
+    tokens: Tuple[str, ...]     # Tokens  = {"HALT","RES"}
+    epoch_max: int              # EpochMax
+    lamport_max: int            # LamportMax
+    hold_ms: int                # HoldMs (not used yet, but kept for completeness)
+    debug: bool = False         # re-check TypeOK/SafeState after every action
+    quiet: bool = False         # don't record action events at all
+    log_size: int = 1024        # most recent events kept for drain_events()
+    step_cache_size: int = 4096 # vote states remembered by auto_step()
+
+    # Derived once in __post_init__ (the config is immutable):
+    domain_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    token_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    domain_index: Dict[str, int] = field(init=False, repr=False, compare=False)
+    token_index: Dict[str, int] = field(init=False, repr=False, compare=False)
+    halt_mask: int = field(init=False, repr=False, compare=False)
+    halt_scan: Callable = field(init=False, repr=False, compare=False)
+    # USPVirel.fingerprint() bit offsets: (epoch, first domain, bits per domain)
+    fingerprint_layout: Tuple[int, int, int] = field(init=False, repr=False, compare=False)
+    # ... and where domain i's (count, mask) bits start
+    vote_shifts: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    # auto_step() memo shared by every machine built on this config, least
+    # recently used first: vote bits of the fingerprint -> HALT quorum?
+    _step_cache: OrderedDict = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+
+    # Read-only vote arrays of a machine with no votes, copied by USPVirel
+    # instead of being rebuilt: (_votes, _counts) (_masks is like _counts)
+    _empty_votes: Tuple[np.ndarray, np.ndarray] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # frozen=True: normalized and derived fields have to bypass __setattr__
+        object.__setattr__(self, "domains", tuple(self.domains))
+        object.__setattr__(self, "tokens", tuple(self.tokens))
+        if len(self.tokens) > 8:
+            raise ValueError("At most 8 tokens are supported")
+        token_index = {t: j for j, t in enumerate(self.tokens)}
+        object.__setattr__(self, "domain_set", frozenset(self.domains))
+        object.__setattr__(self, "token_set", frozenset(self.tokens))
+        object.__setattr__(self, "domain_index", {d: i for i, d in enumerate(self.domains)})
+        object.__setattr__(self, "token_index", token_index)
+        object.__setattr__(
+            self, "halt_mask", 1 << token_index["HALT"] if "HALT" in token_index else 0
+        )
+        object.__setattr__(
+            self, "halt_scan", specialize_halt_scan(len(self.domains), self.halt_mask)
+        )
+        epoch_shift = 1 + self.lamport_max.bit_length()
+        votes_shift = epoch_shift + self.epoch_max.bit_length()
+        width = 2 + len(self.tokens)
+        object.__setattr__(self, "fingerprint_layout", (epoch_shift, votes_shift, width))
+        object.__setattr__(
+            self, "vote_shifts",
+            tuple(votes_shift + i * width for i in range(len(self.domains))),
+        )
+        empty = (
+            np.full((len(self.domains), 2), EMPTY_VOTE, dtype=np.uint8),
+            np.zeros(len(self.domains), dtype=np.uint8),
+        )
+        for a in empty:
+            a.flags.writeable = False
+        object.__setattr__(self, "_empty_votes", empty)
+
+
+@dataclass(eq=False, slots=True)
+class USPVirel:
+    """
+    Python state machine for the USP_VIREL protocol.
+
+    Mirrors the TLA+ spec:
+
+      - VARIABLES: state, epoch, lamport, quorum_votes, provisional_timer
+      - ACTIONS:   CastVote, HaltPrecedence, SafeOnStaysSafe, Idle
+      - INVARIANTS: TypeOK, SafeState
+
+    Votes are stored as fixed-size arrays rather than a dict of lists, so
+    quorum_votes is only an init argument (seed votes for Init); reading
+    the attribute returns a read-only mapping of vote tuples rebuilt from
+    the arrays, and votes the same tuples indexed by domain id. ==
+    compares the variables (including vote order and provisional_timer);
+    fingerprint() only keeps what the guards read.
+    """
+    cfg: USPVirelConfig
+    state: State = State.OPERATIONAL
+    epoch: int = 0
+    lamport: int = 0
+    quorum_votes: InitVar[Optional[Dict[str, List[str]]]] = None
+    provisional_timer: int = 0
+
+    # Vote arrays and event log, set up in __post_init__ (no per-instance
+    # __dict__: every attribute is a slot)
+    _votes: np.ndarray = field(init=False, repr=False)
+    _counts: np.ndarray = field(init=False, repr=False)
+    _masks: np.ndarray = field(init=False, repr=False)
+    _events: Deque[tuple] = field(init=False, repr=False)
+    # Vote bits of fingerprint(), kept up to date by every vote write
+    _vote_fp: int = field(init=False, repr=False)
+
+    def __post_init__(self, quorum_votes: Optional[Dict[str, List[str]]]) -> None:
+        # Also accept State names ("SAFE_ON", as in the TLA+ spec) and values (1)
+        if not isinstance(self.state, State):
+            try:
+                if isinstance(self.state, str):
+                    self.state = State[self.state]
+                else:
+                    self.state = State(self.state)
+            except (KeyError, ValueError, TypeError):
+                raise AssertionError("Invalid state") from None
+
+        # Vote storage, one row per domain (domain i is cfg.domains[i],
+        # token j is cfg.tokens[j]):
+        #   _votes[i, k]      = j of the k-th vote cast in domain i
+        #   _counts[i]        = Len(quorum_votes[d])
+        #   bit j of _masks[i] is set iff cfg.tokens[j] ∈ quorum_votes[d]
+        # The guards only read _counts and _masks, so they never scan votes.
+        # quorum_votes starts as empty sequences for each domain unless seeded
+        if quorum_votes:
+            self._seed_votes(quorum_votes)
+        else:
+            votes, zeros = self.cfg._empty_votes
+            self._votes = votes.copy()
+            self._counts = zeros.copy()
+            self._masks = zeros.copy()
+            self._vote_fp = 0
+
+        # Ring log of raw (tag, domain[, token]) events; formatted only when
+        # drained.
+        self._events = deque(maxlen=self.cfg.log_size)
+
+        # TypeOK only: Init does not have to satisfy SafeState. Seeds are
+        # validated as they are written, so only the other variables are left.
+        self._check_variables()
+
+    def _seed_votes(self, quorum_votes: Mapping[str, List[str]]) -> None:
+        """
+        Build the vote arrays (and their fingerprint bits) from Init seed
+        votes, checking quorum_votes ∈ [Domains -> Seq(Tokens)] on the way.
+        """
+        cfg = self.cfg
+        assert quorum_votes.keys() == cfg.domain_set, \
+            "quorum_votes must have exactly one entry per domain"
+        n = len(cfg.domains)
+        votes = [[EMPTY_VOTE, EMPTY_VOTE] for _ in range(n)]
+        counts = [0] * n
+        masks = [0] * n
+        fp = 0
+        for d, seq in quorum_votes.items():
+            assert isinstance(seq, (list, tuple)), "Votes must be sequences"
+            if len(seq) > 2:
+                raise ValueError(f"At most 2 votes per domain: {d}")
+            i = cfg.domain_index[d]
+            for k, t in enumerate(seq):
+                j = cfg.token_index.get(t)
+                assert j is not None, "Unknown token in quorum_votes"
+                votes[i][k] = j
+                masks[i] |= 1 << j
+            counts[i] = len(seq)
+            fp |= (counts[i] | (masks[i] << 2)) << cfg.vote_shifts[i]
+        self._votes = np.array(votes, dtype=np.uint8).reshape(n, 2)
+        self._counts = np.array(counts, dtype=np.uint8)
+        self._masks = np.array(masks, dtype=np.uint8)
+        self._vote_fp = fp
+
+    # ------------------------------------------------------------------
+    # Helpers (invariants)
+    # ------------------------------------------------------------------
+
+    def _check_all(self, safe_state: bool = True) -> None:
+        """
+        TypeOK and, unless safe_state is False, the SafeState invariant
+
+          state = "SAFE_ON" => ∃ d ∈ Domains : HasHALT(d)
+
+        from the TLA+ spec, checked in a single pass over quorum_votes.
+        Raises AssertionError if violated.
+        """
+        self._check_variables()
+
+        # quorum_votes ∈ [Domains -> Seq(Tokens)], on the view callers see.
+        # It has one entry per cfg.domains by construction (seeds are
+        # checked in __post_init__), so only the row count needs checking.
+        assert self._votes.shape == (len(self.cfg.domains), 2), \
+            "quorum_votes must have exactly one entry per domain"
+        assert (self._counts <= 2).all(), "At most 2 votes per domain"
+        votes = self.votes
+
+        any_halt = False
+        tokens = self.cfg.token_set
+        for seq in votes:
+            for t in seq:
+                assert t in tokens, "Unknown token in quorum_votes"
+                if t == "HALT":
+                    any_halt = True
+
+        if safe_state and self.state == State.SAFE_ON and not any_halt:
+            raise AssertionError("SafeState violated: SAFE_ON without HALT quorum")
+
+    def _check_variables(self) -> None:
+        """
+        The part of TypeOK that does not involve quorum_votes.
+        """
+        assert self.state in (State.OPERATIONAL, State.SAFE_ON), "Invalid state"
+        assert 0 <= self.epoch <= self.cfg.epoch_max, "Epoch out of bounds"
+        assert 0 <= self.lamport <= self.cfg.lamport_max, "Lamport out of bounds"
+        assert isinstance(self.provisional_timer, int) and self.provisional_timer >= 0, \
+            "provisional_timer must be a natural number"
+
+    def assert_invariants(self) -> None:
+        """
+        Public helper to assert all invariants.
+        Call this after any series of operations if you want.
+
+        Actions only re-check the invariants themselves when cfg.debug is
+        set; otherwise their O(1) guards (vote bound, LamportMax) are the
+        only checks on the hot path.
+        """
+        self._check_all()
+
+    # ------------------------------------------------------------------
+    # Actions (CastVote, HaltPrecedence, SafeOnStaysSafe, Idle)
+    # ------------------------------------------------------------------
+
+    def cast_vote(self, domain: str, token: str) -> bool:
+        """
+        CastVote action.
+
+        Guard:
+          - domain ∈ Domains
+          - token ∈ Tokens
+          - state = "OPERATIONAL"
+          - Len(quorum_votes[domain]) < 2   (bounded for finite state)
+
+        Returns True if the vote was accepted, False if guard not satisfied.
+        """
+        i = self.cfg.domain_index.get(domain)
+        if i is None:
+            raise ValueError(f"Unknown domain: {domain}")
+        j = self.cfg.token_index.get(token)
+        if j is None:
+            raise ValueError(f"Unknown token: {token}")
+
+        if self.state != State.OPERATIONAL:
+            return False
+        c = self._counts[i]
+        if c >= 2:
+            return False
+
+        # Effect:
+        #   state' = state
+        #   epoch' = epoch
+        #   lamport' = lamport
+        #   quorum_votes'[domain] = Append(.., token)
+        #   provisional_timer' = provisional_timer
+        self._votes[i, c] = j
+        self._counts[i] = c + 1
+        # ... and the same (count, mask) change in the fingerprint bits
+        bit = 1 << j
+        mask = self._masks[i]
+        if mask & bit:
+            self._vote_fp += 1 << self.cfg.vote_shifts[i]
+        else:
+            self._masks[i] = mask | bit
+            self._vote_fp += (1 | (bit << 2)) << self.cfg.vote_shifts[i]
+        if not self.cfg.quiet:
+            self._events.append(("CAST", domain, token))
+
+        if self.cfg.debug:
+            self.assert_invariants()
+        return True
+
+    def halt_precedence(self) -> bool:
+        """
+        HaltPrecedence action.
+
+        Guard:
+          ∃ d ∈ Domains :
+            state = "OPERATIONAL" ∧
+            Len(quorum_votes[d]) ≥ 2 ∧
+            HasHALT(d)
+
+        Effect:
+          state'   = "SAFE_ON"
+          epoch'   = epoch
+          lamport' = lamport + 1
+        """
+        if self.state != State.OPERATIONAL:
+            return False
+
+        i = self.cfg.halt_scan(self._counts, self._masks)
+        if i < 0:
+            return False
+        if self.lamport >= self.cfg.lamport_max:
+            raise AssertionError("LamportMax would be exceeded")
+        self.state = State.SAFE_ON
+        self.lamport += 1
+        if not self.cfg.quiet:
+            self._events.append(("HALT", self.cfg.domains[i]))
+        if self.cfg.debug:
+            self.assert_invariants()
+        return True
+
+    def safe_on_stays_safe(self) -> bool:
+        """
+        SafeOnStaysSafe action.
+
+        Guard:
+          state = "SAFE_ON"
+
+        Effect:
+          state' = "SAFE_ON"
+          (everything else unchanged)
+        """
+        if self.state != State.SAFE_ON:
+            return False
+        # No state change; in debug mode we just check invariants.
+        if self.cfg.debug:
+            self.assert_invariants()
+        return True
+
+    def idle(self) -> None:
+        """
+        Idle action: leaves all variables unchanged.
+        Always enabled.
+        """
+        # UNCHANGED vars
+        if self.cfg.debug:
+            self.assert_invariants()
+
+    # ------------------------------------------------------------------
+    # Convenience methods
+    # ------------------------------------------------------------------
+
+    def auto_step(self) -> str:
+        """
+        A helper that approximates the TLA+ Next relation:
+
+          Next == CastVote \/ HaltPrecedence \/ SafeOnStaysSafe \/ Idle
+
+        For real systems you’d call the actions directly; this is just for
+        quick simulations. Returns the action taken: "halt_precedence",
+        "safe_on" or "idle".
+
+        Whether some domain has a HALT quorum only depends on the vote bits
+        of fingerprint(), so that is memoized per config (the last
+        cfg.step_cache_size vote states) and idling in a revisited state
+        skips the halt scan. HaltPrecedence itself still goes through
+        halt_precedence(), guard included.
+        """
+        if self.state == State.SAFE_ON:
+            self.safe_on_stays_safe()
+            return "safe_on"
+
+        cache = self.cfg._step_cache
+        key = self._vote_fp
+        quorum = cache.get(key)
+        if quorum is None:
+            quorum = cache[key] = self.cfg.halt_scan(self._counts, self._masks) >= 0
+            if len(cache) > self.cfg.step_cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+
+        # Prioritize HaltPrecedence if it's enabled.
+        if quorum and self.halt_precedence():
+            return "halt_precedence"
+        # In TLA+, CastVote is nondeterministic; here we do nothing.
+        self.idle()
+        return "idle"
+
+    def fingerprint(self) -> int:
+        """
+        Pack everything the action guards read into a single int:
+
+          bit 0            state (State value)
+          next L bits      lamport   (L = LamportMax.bit_length())
+          next E bits      epoch     (E = EpochMax.bit_length())
+          per domain i     count (2 bits) | mask (|Tokens| bits)
+
+        Vote order and provisional_timer are not part of it: no guard
+        depends on them. The per-domain bits are maintained as votes are
+        written, so this is O(1).
+        """
+        epoch_shift = self.cfg.fingerprint_layout[0]
+        return self._vote_fp | int(self.state) | (self.lamport << 1) | (self.epoch << epoch_shift)
+
+    def _pack_votes(self) -> int:
+        """
+        The per-domain part of fingerprint(), rebuilt from the arrays.
+        """
+        _, shift, width = self.cfg.fingerprint_layout
+        fp = 0
+        for count, mask in zip(self._counts.tolist(), self._masks.tolist()):
+            fp |= (count | (mask << 2)) << shift
+            shift += width
+        return fp
+
+    @classmethod
+    def from_fingerprint(cls, cfg: USPVirelConfig, fp: int) -> USPVirel:
+        """
+        A machine in the state packed into fp by fingerprint(). Since the
+        fingerprint drops vote order, each domain's votes come back in
+        cfg.tokens order (a token twice if it is the only one in the mask).
+        """
+        epoch_shift, shift, width = cfg.fingerprint_layout
+        fp = int(fp)
+        votes = {}
+        for d in cfg.domains:
+            slot = (fp >> shift) & ((1 << width) - 1)
+            seq = [t for j, t in enumerate(cfg.tokens) if (slot >> 2) & (1 << j)]
+            votes[d] = (seq * 2)[:slot & 3]
+            shift += width
+        return cls(
+            cfg,
+            state=State(fp & 1),
+            epoch=(fp >> epoch_shift) & ((1 << cfg.epoch_max.bit_length()) - 1),
+            lamport=(fp >> 1) & ((1 << cfg.lamport_max.bit_length()) - 1),
+            quorum_votes=votes,
+        )
+
+    def clone(self) -> USPVirel:
+        """
+        Independent copy of this machine, e.g. a snapshot for state-space
+        exploration. The config (and so its auto_step() memo) is shared;
+        the fixed-size vote arrays are copied directly, with no rebuild
+        through quorum_votes and no copy of the config. The clone starts with
+        an empty event log: undrained events stay with this machine.
+        """
+        new = object.__new__(type(self))
+        new.cfg = self.cfg
+        new.state = self.state
+        new.epoch = self.epoch
+        new.lamport = self.lamport
+        new.provisional_timer = self.provisional_timer
+        new._votes = self._votes.copy()
+        new._counts = self._counts.copy()
+        new._masks = self._masks.copy()
+        new._events = deque(maxlen=self._events.maxlen)
+        new._vote_fp = self._vote_fp
+        return new
+
+    __copy__ = clone
+
+    def __deepcopy__(self, memo: dict) -> USPVirel:
+        return self.clone()
+
+    def __eq__(self, other: object) -> bool:
+        # What the generated __eq__ compared, with quorum_votes read from
+        # the arrays (_masks follows from _votes and _counts)
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.cfg == other.cfg
+            and self.state == other.state
+            and self.epoch == other.epoch
+            and self.lamport == other.lamport
+            and self.provisional_timer == other.provisional_timer
+            and np.array_equal(self._counts, other._counts)
+            and np.array_equal(self._votes, other._votes)
+        )
+
+    __hash__ = None  # mutable, as with the generated __eq__
+
+    def run_batch(self, script: np.ndarray) -> np.ndarray:
+        """
+        Run a batch of actions in compiled code and return their outcomes.
+
+        script is an array of (op, domain index, token index) rows, see
+        run_steps() and the OP_* constants. It is converted to int64, so any
+        index is passed through unchanged (out-of-range ones raise ValueError
+        instead of wrapping onto another domain). The machine's variables are
+        updated as if each action had been called directly, but no events
+        are logged and invariants are only checked once, at the end, in
+        debug mode.
+        """
+        cfg = self.cfg
+        m = MachineState(len(cfg.domains), len(cfg.tokens), cfg.lamport_max, cfg.halt_mask)
+        m.state = self.state
+        m.epoch = self.epoch
+        m.lamport = self.lamport
+        m.timer = self.provisional_timer
+        m.votes[:] = self._votes
+        m.counts[:] = self._counts
+        m.masks[:] = self._masks
+        try:
+            return run_steps(m, np.ascontiguousarray(script, dtype=np.int64))
+        finally:
+            # Keep whatever ran before an action raised, like direct calls do
+            self.state = State(m.state)
+            self.lamport = int(m.lamport)
+            self._votes[:] = m.votes
+            self._counts[:] = m.counts
+            self._masks[:] = m.masks
+            self._vote_fp = self._pack_votes()
+            if cfg.debug:
+                self.assert_invariants()
+
+    def drain_events(self) -> List[str]:
+        """
+        Return the logged action events as text (oldest first) and clear
+        the log. Only the last cfg.log_size events are kept.
+        """
+        out = [self.format_event(event) for event in self._events]
+        self._events.clear()
+        return out
+
+    def format_event(self, event: tuple) -> str:
+        """
+        Text for one raw ("CAST", domain, token) / ("HALT", domain) event.
+        """
+        if event[0] == "CAST":
+            return f"CAST {event[2]} IN {event[1]}"
+        return f"HALT QUORUM FOR {event[1]} → SAFE_ON"
+
+    @property
+    def votes(self) -> Tuple[Tuple[str, ...], ...]:
+        """
+        Vote sequences indexed by domain id (votes[i] is for cfg.domains[i]),
+        rebuilt from the arrays. Tuples, since writing to a rebuilt copy
+        would not reach the machine; cast votes with cast_vote().
+        """
+        tokens = self.cfg.tokens
+        counts = self._counts.tolist()
+        return tuple(
+            tuple(tokens[j] for j in row[:counts[i]])
+            for i, row in enumerate(self._votes.tolist())
+        )
+
+    def _quorum_votes_view(self) -> Mapping[str, Tuple[str, ...]]:
+        """
+        quorum_votes as a read-only mapping keyed by domain name, for
+        external callers.
+        """
+        return MappingProxyType(dict(zip(self.cfg.domains, self.votes)))
+
+    def __repr__(self) -> str:
+        votes = {d: list(v) for d, v in zip(self.cfg.domains, self.votes)}
+        return (
+            f"USP_VIREL(state={self.state.name}, epoch={self.epoch}, "
+            f"lamport={self.lamport}, votes={votes}, "
+            f"timer={self.provisional_timer})"
+        )
+
+
+# quorum_votes is an InitVar above; once the machine exists the attribute is
+# the read-only view over the vote arrays.
+USPVirel.quorum_votes = property(USPVirel._quorum_votes_view)
@@ -0,0 +1,78 @@
+"""
+Breadth-first enumeration of the reachable USP_VIREL state space, with
+every state packed into one integer as by USPVirel.fingerprint().
+"""
+from __future__ import annotations
+from typing import Optional
+
+import numpy as np
+
+from .core import USPVirel, USPVirelConfig, njit
+
+
+@njit(cache=True)
+def _successors(frontier, n_domains, n_tokens, lamport_max, halt_mask,
+                epoch_shift, votes_shift, width):
+    """
+    All fingerprints one CastVote or HaltPrecedence step away from the
+    states in frontier (with duplicates). SafeOnStaysSafe and Idle only
+    stutter, so they add nothing.
+    """
+    out = np.empty(frontier.shape[0] * (n_domains * n_tokens + 1), dtype=np.int64)
+    lamport_bits = (1 << (epoch_shift - 1)) - 1
+    slot_bits = (1 << width) - 1
+    k = 0
+    for fp in frontier:
+        if fp & 1:      # SAFE_ON: neither CastVote nor HaltPrecedence
+            continue
+
+        halt = False
+        for i in range(n_domains):
+            shift = votes_shift + i * width
+            slot = (fp >> shift) & slot_bits
+            count = slot & 3
+            mask = slot >> 2
+            if count >= 2:
+                if mask & halt_mask:
+                    halt = True
+                continue
+            # CastVote(d, t) for every token
+            for j in range(n_tokens):
+                new_slot = (count + 1) | ((mask | (1 << j)) << 2)
+                out[k] = (fp & ~(slot_bits << shift)) | (new_slot << shift)
+                k += 1
+
+        # HaltPrecedence; it is disabled rather than an error at LamportMax
+        lamport = (fp >> 1) & lamport_bits
+        if halt and lamport < lamport_max:
+            out[k] = (fp & ~(lamport_bits << 1)) | ((lamport + 1) << 1) | 1
+            k += 1
+    return out[:k]
+
+
+def generate_reachable(cfg: USPVirelConfig, start: Optional[USPVirel] = None) -> np.ndarray:
+    """
+    Sorted uint64 fingerprints of every state reachable from start (a
+    machine built on cfg, a fresh one by default) via CastVote and
+    HaltPrecedence. Each BFS level is
+    expanded by one _successors() call over the whole frontier and
+    deduplicated with np.unique. Decode states with
+    USPVirel.from_fingerprint().
+    """
+    epoch_shift, votes_shift, width = cfg.fingerprint_layout
+    if votes_shift + width * len(cfg.domains) > 63:
+        raise ValueError("State fingerprints for this config do not fit in 63 bits")
+
+    if start is None:
+        start = USPVirel(cfg)
+    elif start.cfg is not cfg:
+        raise ValueError("start must be a machine built on cfg")
+    # Every step adds one to (votes cast + state), so a successor can never
+    # be in an earlier level: deduplicating each level on its own is enough.
+    levels = [np.array([start.fingerprint()], dtype=np.int64)]
+    while levels[-1].size:
+        levels.append(np.unique(_successors(
+            levels[-1], len(cfg.domains), len(cfg.tokens), cfg.lamport_max,
+            cfg.halt_mask, epoch_shift, votes_shift, width,
+        )))
+    return np.sort(np.concatenate(levels)).astype(np.uint64)
@@ -0,0 +1,168 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Cython port of the USP_VIREL state machine, for TLC-style explorers that
+call the actions in a tight loop.
+
+Same variables, guards and effects as usp_virel.core.USPVirel, with
+domains and tokens given by index (cfg.domain_index / cfg.token_index)
+and state as an int (0 = OPERATIONAL, 1 = SAFE_ON). There is no event log
+and no invariant checking. Build in place with:
+
+    cythonize -i usp_virel/usp_virel_c.pyx
+"""
+
+cdef enum:
+    MAX_D = 64          # max |Domains|
+    MAX_T = 8           # max |Tokens| (one mask bit each)
+    EMPTY_VOTE = 255    # token id stored in an unused vote slot
+
+# step() / step_many() outcomes, as STEP_* in usp_virel.core
+STEP_IDLE = 0
+STEP_HALT_PRECEDENCE = 1
+STEP_SAFE_ON = 2
+
+cdef enum:
+    _IDLE = 0
+    _HALT = 1
+    _SAFE_ON = 2
+    _LAMPORT_EXCEEDED = -1
+
+
+cdef class USPVirel:
+    cdef public int state, epoch, lamport, provisional_timer
+    cdef readonly int n_domains, n_tokens, epoch_max, lamport_max
+    cdef unsigned char halt_mask
+    cdef unsigned char counts[MAX_D]
+    cdef unsigned char masks[MAX_D]
+    cdef unsigned char votes[MAX_D][2]
+
+    def __cinit__(self, int n_domains, int n_tokens, int halt_token,
+                  int epoch_max, int lamport_max):
+        """
+        halt_token is the index of "HALT" in cfg.tokens, or -1 if absent.
+        """
+        cdef int i
+        if not 0 <= n_domains <= MAX_D:
+            raise ValueError(f"At most {MAX_D} domains are supported")
+        if not 0 <= n_tokens <= MAX_T:
+            raise ValueError(f"At most {MAX_T} tokens are supported")
+        if not -1 <= halt_token < n_tokens:
+            raise ValueError(f"Unknown token index: {halt_token}")
+        self.n_domains = n_domains
+        self.n_tokens = n_tokens
+        self.halt_mask = (1 << halt_token) if halt_token >= 0 else 0
+        self.epoch_max = epoch_max
+        self.lamport_max = lamport_max
+        self.state = self.epoch = self.lamport = self.provisional_timer = 0
+        for i in range(MAX_D):
+            self.counts[i] = 0
+            self.masks[i] = 0
+            self.votes[i][0] = EMPTY_VOTE
+            self.votes[i][1] = EMPTY_VOTE
+
+    # ------------------------------------------------------------------
+    # GIL-free kernels
+    # ------------------------------------------------------------------
+
+    cdef bint _cast_vote(self, int i, int j) noexcept nogil:
+        cdef unsigned char c = self.counts[i]
+        if self.state != 0 or c >= 2:
+            return False
+        self.votes[i][c] = <unsigned char>j
+        self.counts[i] = c + 1
+        self.masks[i] |= <unsigned char>(1 << j)
+        return True
+
+    cdef int _find_halt_domain(self) noexcept nogil:
+        cdef int i
+        for i in range(self.n_domains):
+            if self.counts[i] >= 2 and (self.masks[i] & self.halt_mask):
+                return i
+        return -1
+
+    cdef int _halt_precedence(self) noexcept nogil:
+        if self.state != 0 or self._find_halt_domain() < 0:
+            return _IDLE
+        if self.lamport >= self.lamport_max:
+            return _LAMPORT_EXCEEDED
+        self.state = 1
+        self.lamport += 1
+        return _HALT
+
+    cdef int _step(self) noexcept nogil:
+        cdef int r = self._halt_precedence()
+        if r != _IDLE:
+            return r
+        return _SAFE_ON if self.state == 1 else _IDLE
+
+    # ------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------
+
+    cpdef bint cast_vote(self, int d_idx, int t_idx) except -1:
+        """
+        CastVote for domain index d_idx and token index t_idx.
+        Returns True if the vote was accepted, False if guard not satisfied.
+        """
+        if not 0 <= d_idx < self.n_domains:
+            raise ValueError(f"Unknown domain index: {d_idx}")
+        if not 0 <= t_idx < self.n_tokens:
+            raise ValueError(f"Unknown token index: {t_idx}")
+        return self._cast_vote(d_idx, t_idx)
+
+    cpdef bint halt_precedence(self) except -1:
+        """
+        HaltPrecedence action. Returns True if it fired.
+        """
+        cdef int r = self._halt_precedence()
+        if r == _LAMPORT_EXCEEDED:
+            raise AssertionError("LamportMax would be exceeded")
+        return r == _HALT
+
+    cpdef bint safe_on_stays_safe(self):
+        return self.state == 1
+
+    cpdef int step(self) except -2:
+        """
+        One auto_step(): HaltPrecedence if enabled, else SafeOnStaysSafe or
+        Idle. Returns a STEP_* code.
+        """
+        cdef int r = self._step()
+        if r == _LAMPORT_EXCEEDED:
+            raise AssertionError("LamportMax would be exceeded")
+        return r
+
+    cpdef int step_many(self, int n) except -2:
+        """
+        Run step() n times with the GIL released; returns the last STEP_*
+        code (STEP_IDLE if n == 0).
+        """
+        cdef int k, r = _IDLE
+        with nogil:
+            for k in range(n):
+                r = self._step()
+                if r == _LAMPORT_EXCEEDED:
+                    break
+        if r == _LAMPORT_EXCEEDED:
+            raise AssertionError("LamportMax would be exceeded")
+        return r
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    def votes_of(self, int d_idx):
+        """
+        Token indices cast in domain d_idx, in order.
+        """
+        if not 0 <= d_idx < self.n_domains:
+            raise ValueError(f"Unknown domain index: {d_idx}")
+        return [self.votes[d_idx][k] for k in range(self.counts[d_idx])]
+
+    def __repr__(self):
+        return (
+            f"USP_VIREL_C(state={'SAFE_ON' if self.state else 'OPERATIONAL'}, "
+            f"epoch={self.epoch}, lamport={self.lamport}, "
+            f"votes={[self.votes_of(i) for i in range(self.n_domains)]}, "
+            f"timer={self.provisional_timer})"
+        )